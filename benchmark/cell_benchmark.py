@@ -0,0 +1,258 @@
+# benchmark/cell_benchmark.py
+"""
+Offline cycle-time benchmark for the whole cell.
+
+Runs frame -> ObjectDetector / QRDetector -> vision_utils conversion -> PathPlanner
+-> SimulatedRobot for several object counts and layouts, and writes picks/hour,
+per-stage timings and tail latencies to a JSON file.
+
+    python -m benchmark.cell_benchmark --objects 1 5 10 --layouts grid random cluster
+    python -m benchmark.cell_benchmark --compare bench_results_old.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from vision.object_detector import ObjectDetector
+from vision.qr_detector import QRDetector
+from vision.part_library import PartLibrary
+from vision.vision_utils import pixel_to_mm, vision_to_robot_coords
+from robot.path_planner import PathPlanner
+from robot.simulated_robot import SimulatedRobot
+from benchmark.synthetic_scene import SyntheticScene, RecordedFrames, LAYOUTS
+
+RESULTS_VERSION = 1
+STAGES = ("capture", "detect_objects", "detect_qr", "convert", "plan")
+
+
+def latency_stats(values_s):
+    """Summary in milliseconds"""
+    if not values_s:
+        return None
+    ms = np.asarray(values_s) * 1000.0
+    return {
+        "mean": round(float(ms.mean()), 3),
+        "p50": round(float(np.percentile(ms, 50)), 3),
+        "p90": round(float(np.percentile(ms, 90)), 3),
+        "p99": round(float(np.percentile(ms, 99)), 3),
+        "max": round(float(ms.max()), 3)
+    }
+
+
+class CellBenchmark:
+    def __init__(self, scale=0.5, origin_offset=(50, 50), place_mm=(300.0, 300.0), robot_kwargs=None,
+                 part_library=None):
+        self.scale = scale
+        self.origin_offset = origin_offset
+        self.place_mm = place_mm
+        self.robot_kwargs = robot_kwargs or {}
+        self.object_detector = ObjectDetector(part_library)
+        self.qr_detector = QRDetector()
+        self.planner = PathPlanner()
+
+    def _to_robot_pose(self, coords, frame_height, angle_deg=0.0):
+        # Same origin / inverted Y handling as MainUI.execute_task
+        ox, oy = self.origin_offset[0], frame_height - self.origin_offset[1]
+        adj_x, adj_y = coords[0] - ox, oy - coords[1]
+        x_mm, y_mm = pixel_to_mm((adj_x, adj_y), self.scale)
+        return vision_to_robot_coords(x_mm, y_mm, angle_deg=angle_deg)
+
+    @staticmethod
+    def _inside(coords, region):
+        if region is None:
+            return False
+        x, y, w, h = region
+        return x <= coords[0] <= x + w and y <= coords[1] <= y + h
+
+    def run_scenario(self, name, source, cycles, warmup=3):
+        robot = SimulatedRobot(**self.robot_kwargs)
+        timings = {stage: [] for stage in STAGES}
+        software, motion, sequential, pipelined = [], [], [], []
+        picks = failed = empty = 0
+
+        for cycle in range(warmup + cycles):
+            measured = cycle >= warmup
+            times = {}
+
+            t = time.perf_counter()
+            frame = source.render().copy()  # the UI works on a copy from CameraHandler.get_frame
+            times["capture"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            objects, _ = self.object_detector.detect_objects(frame, draw=False, mm_per_px=self.scale)
+            times["detect_objects"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            zones = self.qr_detector.detect_zones(frame, draw=False)
+            times["detect_qr"] = time.perf_counter() - t
+
+            objects = [o for o in objects if not self._inside(o["coords"], source.qr_region())]
+            if not objects:
+                if measured:
+                    empty += 1
+                source.remove_object((0, 0))
+                continue
+            target = objects[0]
+
+            t = time.perf_counter()
+            pick_pose = self._to_robot_pose(target["coords"], frame.shape[0], target.get("angle", 0.0))
+            if zones:
+                place_pose = self._to_robot_pose(zones[0]["coords"], frame.shape[0])
+            else:
+                place_pose = vision_to_robot_coords(*self.place_mm)
+            times["convert"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            path = self.planner.generate_path("pick", pick_pose) + self.planner.generate_path("place", place_pose)
+            times["plan"] = time.perf_counter() - t
+
+            # Gripper closes at the pick waypoint (1) and opens at the place waypoint (4)
+            ok = robot.execute_path(path, grip_at=[1, 4])
+            source.remove_object(target["coords"])
+
+            if not measured:
+                continue
+            for stage in STAGES:
+                timings[stage].append(times[stage])
+            sw = sum(times.values())
+            software.append(sw)
+            motion.append(robot.last_motion_time)
+            # Sequential: the robot waits for vision. Pipelined: vision of the next part overlaps motion.
+            sequential.append(sw + robot.last_motion_time)
+            pipelined.append(max(sw, robot.last_motion_time))
+            if ok:
+                picks += 1
+            else:
+                failed += 1
+
+        def per_hour(cycle_times):
+            total = sum(cycle_times)
+            return round(picks * 3600.0 / total, 1) if total > 0 else 0.0
+
+        return {
+            "name": name,
+            "layout": source.layout,
+            "objects": source.num_objects,
+            "cycles": cycles,
+            "picks": picks,
+            "failed_picks": failed,
+            "empty_frames": empty,
+            "refills": source.refills,
+            "picks_per_hour": {
+                "sequential": per_hour(sequential),
+                "pipelined": per_hour(pipelined)
+            },
+            "stages_ms": {stage: latency_stats(timings[stage]) for stage in STAGES},
+            "software_ms": latency_stats(software),
+            "robot_motion_ms": latency_stats(motion),
+            "cycle_ms": latency_stats(sequential)
+        }
+
+
+def environment_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__
+    }
+
+
+def print_summary(results):
+    print(f"{'scenario':<18}{'picks/h seq':>12}{'picks/h pipe':>13}{'sw p50 ms':>12}{'sw p99 ms':>12}{'cycle p99':>11}")
+    for r in results["scenarios"]:
+        software = r["software_ms"] or {}
+        cycle = r["cycle_ms"] or {}
+        print(f"{r['name']:<18}{r['picks_per_hour']['sequential']:>12}{r['picks_per_hour']['pipelined']:>13}"
+              f"{software.get('p50', '-'):>12}{software.get('p99', '-'):>12}{cycle.get('p99', '-'):>11}")
+
+
+def print_comparison(results, previous_path):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {s["name"]: s for s in json.load(f).get("scenarios", [])}
+    print(f"\nCompared with {previous_path}:")
+    for r in results["scenarios"]:
+        old = previous.get(r["name"])
+        if old is None:
+            print(f"  {r['name']:<18} (new scenario)")
+            continue
+        new_rate, old_rate = r["picks_per_hour"]["sequential"], old["picks_per_hour"]["sequential"]
+        change = (new_rate - old_rate) / old_rate * 100.0 if old_rate else 0.0
+        new_p99 = (r["software_ms"] or {}).get("p99", 0.0)
+        old_p99 = (old["software_ms"] or {}).get("p99", 0.0)
+        print(f"  {r['name']:<18} picks/h {old_rate} -> {new_rate} ({change:+.1f}%), "
+              f"software p99 {old_p99} -> {new_p99} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline cycle-time benchmark for the robotic cell")
+    parser.add_argument("--objects", type=int, nargs="+", default=[1, 5, 10, 20], help="objects on the table")
+    parser.add_argument("--layouts", nargs="+", default=list(LAYOUTS), choices=LAYOUTS)
+    parser.add_argument("--frames-dir", help="use recorded images instead of synthetic scenes")
+    parser.add_argument("--cycles", type=int, default=50, help="measured pick cycles per scenario")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--frame-size", type=int, nargs=2, default=[1280, 720], metavar=("W", "H"))
+    parser.add_argument("--scale", type=float, default=0.5, help="mm per pixel")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--part-library", help="PartLibrary directory, enables part classification")
+    parser.add_argument("--speed", type=float, default=500.0, help="robot max linear speed (mm/s)")
+    parser.add_argument("--accel", type=float, default=1000.0, help="robot acceleration (mm/s^2)")
+    parser.add_argument("--settle", type=float, default=0.05, help="settle time per waypoint (s)")
+    parser.add_argument("--gripper", type=float, default=0.3, help="gripper actuation time (s)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    part_library = None
+    if args.part_library:
+        part_library = PartLibrary.load(args.part_library)
+        if part_library is None:
+            print(f"[CellBenchmark] ❌ No part library found in {args.part_library}")
+            return 1
+
+    bench = CellBenchmark(
+        scale=args.scale,
+        robot_kwargs={"max_speed": args.speed, "max_accel": args.accel,
+                      "settle_time": args.settle, "gripper_time": args.gripper},
+        part_library=part_library
+    )
+
+    scenarios = []
+    if args.frames_dir:
+        scenarios.append(bench.run_scenario("recorded", RecordedFrames(args.frames_dir), args.cycles, args.warmup))
+    else:
+        for layout in args.layouts:
+            for count in args.objects:
+                scene = SyntheticScene(count, layout, tuple(args.frame_size), seed=args.seed)
+                scenarios.append(bench.run_scenario(f"{layout}_{count}", scene, args.cycles, args.warmup))
+
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment_info(),
+        "config": vars(args),
+        "scenarios": scenarios
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print_summary(results)
+    if args.compare:
+        print_comparison(results, args.compare)
+    print(f"\n[CellBenchmark] 💾 Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# benchmark/part_rotation_check.py
+"""
+Rotation sweep for PartLibrary: indexes the synthetic shapes at 0 deg, then rotates each
+one through 0-360 deg and checks it is still recognised with the right angle.
+Mirror images of the chiral shapes are checked too: with only the original indexed they
+must be rejected, and with a mirrored reference added they must match that one.
+Exits with 1 on any miss, so it can guard descriptor changes.
+
+    python -m benchmark.part_rotation_check --step 10
+"""
+import sys
+import argparse
+import tempfile
+
+import cv2
+
+from vision.part_library import PartLibrary
+from benchmark.synthetic_scene import SyntheticScene, SHAPES
+
+# Rotational symmetry period per shape (deg); None = angle is meaningless
+SYMMETRY = {"rect": 180.0, "lbracket": 360.0, "circle": None}
+# Shapes that differ from their mirror image
+CHIRAL = ("lbracket",)
+
+
+def angle_error(estimated, expected, period):
+    diff = (estimated - expected) % period
+    return min(diff, period - diff)
+
+
+def render_part(scene, shape, angle, size, mirrored=False):
+    scene.objects = [{"shape": shape, "center": (scene.width / 2, scene.height / 2), "size": size, "angle": angle}]
+    frame = scene.render()
+    return cv2.flip(frame, 1) if mirrored else frame
+
+
+def build_library(scene, size, mm_per_px, with_mirrored):
+    library = PartLibrary(tempfile.mkdtemp())
+    for shape in SHAPES:
+        library.add_reference_image(shape, render_part(scene, shape, 0, size), mm_per_px)
+    if with_mirrored:
+        for shape in CHIRAL:
+            library.add_reference_image(f"{shape}_mirrored", render_part(scene, shape, 0, size, True), mm_per_px)
+    library.build()
+    return library
+
+
+def sweep_shape(library, scene, shape, step, size, max_angle_error, mm_per_px, mirrored, expected_sku):
+    """Return failure messages for one shape; expected_sku None means it must be rejected"""
+    name = f"{shape} (mirrored)" if mirrored else shape
+    failures = []
+    worst_distance, worst_error = 0.0, 0.0
+    for angle in range(0, 360, step):
+        contours = library.detector.find_contours(render_part(scene, shape, angle, size, mirrored))
+        sku, estimated, distance = library.classify(max(contours, key=cv2.contourArea), mm_per_px)
+        if sku != expected_sku:
+            failures.append(f"{name} at {angle} deg classified as {sku} (distance {distance:.2f})")
+            continue
+        if sku is None:
+            continue
+        worst_distance = max(worst_distance, distance)
+        if SYMMETRY[shape] is None:
+            continue
+        # The scene rotates clockwise on screen; the library reports CCW (Y up).
+        # Flipping the image turns that rotation around.
+        error = angle_error(estimated, angle if mirrored else -angle, SYMMETRY[shape])
+        worst_error = max(worst_error, error)
+        if error > max_angle_error:
+            failures.append(f"{name} at {angle} deg estimated {estimated:.1f} deg (error {error:.1f})")
+    if expected_sku is None:
+        print(f"{name:<20} rejected at every angle" if not failures else f"{name:<20} not always rejected")
+    else:
+        print(f"{name:<20} worst distance {worst_distance:.2f}  worst angle error {worst_error:.1f} deg")
+    return failures
+
+
+def run_sweep(step=10, size=60, max_angle_error=5.0, mm_per_px=0.5):
+    scene = SyntheticScene(0, "grid", place_zone_label=None)
+    args = (step, size, max_angle_error, mm_per_px)
+    failures = []
+
+    library = build_library(scene, size, mm_per_px, with_mirrored=False)
+    for shape in SHAPES:
+        failures += sweep_shape(library, scene, shape, *args, mirrored=False, expected_sku=shape)
+    for shape in CHIRAL:
+        failures += sweep_shape(library, scene, shape, *args, mirrored=True, expected_sku=None)
+
+    # Left/right variants share a descriptor; each must still find its own reference
+    library = build_library(scene, size, mm_per_px, with_mirrored=True)
+    for shape in CHIRAL:
+        failures += sweep_shape(library, scene, shape, *args, mirrored=False, expected_sku=shape)
+        failures += sweep_shape(library, scene, shape, *args, mirrored=True, expected_sku=f"{shape}_mirrored")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PartLibrary rotation sweep")
+    parser.add_argument("--step", type=int, default=10, help="rotation step (deg)")
+    parser.add_argument("--size", type=float, default=60, help="part size (px)")
+    parser.add_argument("--max-angle-error", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    failures = run_sweep(args.step, args.size, args.max_angle_error)
+    for failure in failures:
+        print(f"[PartRotationCheck] ❌ {failure}")
+    if failures:
+        return 1
+    print("[PartRotationCheck] ✔ All rotations recognised")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# benchmark/synthetic_scene.py
+import os
+import cv2
+import random
+import numpy as np
+
+LAYOUTS = ("grid", "random", "cluster")
+SHAPES = ("rect", "circle", "lbracket")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class SyntheticScene:
+    def __init__(self, num_objects, layout="random", frame_size=(1280, 720), seed=0,
+                 place_zone_label="PLACE"):
+        """
+        Draws dark parts on a light table so ObjectDetector sees them like the real cell.
+        A QR code marks the place zone in the top right corner (skip with place_zone_label=None).
+        `remove_object` takes a picked part away; the tray refills once it is empty.
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"[SyntheticScene] Unknown layout: {layout}")
+        self.num_objects = num_objects
+        self.layout = layout
+        self.width, self.height = frame_size
+        self.rng = random.Random(seed)
+        self.place_zone_label = place_zone_label
+        self.qr_image = self._make_qr(place_zone_label) if place_zone_label else None
+        self.objects = []
+        self.refills = 0
+        self.refill()
+
+    def _make_qr(self, text):
+        encoder = cv2.QRCodeEncoder.create()
+        qr = encoder.encode(text)
+        qr = cv2.resize(qr, (120, 120), interpolation=cv2.INTER_NEAREST)
+        qr = cv2.copyMakeBorder(qr, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=255)
+        return cv2.cvtColor(qr, cv2.COLOR_GRAY2BGR)
+
+    def qr_region(self):
+        """(x, y, w, h) of the place-zone marker, so its modules are not picked as parts"""
+        if self.qr_image is None:
+            return None
+        h, w = self.qr_image.shape[:2]
+        return (self.width - w - 10, 10, w, h)
+
+    def _free_area(self):
+        # Keep parts away from the border and the QR marker
+        top = 10 + (self.qr_image.shape[0] + 10 if self.qr_image is not None else 0)
+        return 80, top + 60, self.width - 80, self.height - 80
+
+    def _positions(self):
+        x0, y0, x1, y1 = self._free_area()
+        n = self.num_objects
+        if self.layout == "grid":
+            cols = max(1, int(np.ceil(np.sqrt(n * (x1 - x0) / max(1, y1 - y0)))))
+            rows = int(np.ceil(n / cols))
+            dx, dy = (x1 - x0) / cols, (y1 - y0) / max(1, rows)
+            return [(x0 + dx * (i % cols + 0.5), y0 + dy * (i // cols + 0.5)) for i in range(n)]
+
+        if self.layout == "cluster":
+            cx, cy = self.rng.uniform(x0 + 150, x1 - 150), self.rng.uniform(y0 + 100, y1 - 100)
+            spread = 40 + 12 * n
+            return [(min(max(self.rng.gauss(cx, spread), x0), x1),
+                     min(max(self.rng.gauss(cy, spread * 0.6), y0), y1)) for _ in range(n)]
+
+        # random: rejection sampling so parts do not overlap
+        positions = []
+        for _ in range(n):
+            for _attempt in range(200):
+                p = (self.rng.uniform(x0, x1), self.rng.uniform(y0, y1))
+                if all(np.hypot(p[0] - q[0], p[1] - q[1]) > 110 for q in positions):
+                    break
+            positions.append(p)
+        return positions
+
+    def refill(self):
+        self.objects = [{
+            "shape": self.rng.choice(SHAPES),
+            "center": center,
+            "size": self.rng.uniform(40, 80),
+            "angle": self.rng.uniform(0, 180)
+        } for center in self._positions()]
+        self.refills += 1
+
+    def remove_object(self, coords):
+        """Remove the part closest to `coords` (pixels)"""
+        if not self.objects:
+            return
+        closest = min(self.objects, key=lambda o: np.hypot(o["center"][0] - coords[0], o["center"][1] - coords[1]))
+        self.objects.remove(closest)
+        if not self.objects:
+            self.refill()
+
+    def _polygon(self, obj):
+        cx, cy = obj["center"]
+        s = obj["size"]
+        if obj["shape"] == "rect":
+            pts = np.array([[-s, -s / 2], [s, -s / 2], [s, s / 2], [-s, s / 2]])
+        elif obj["shape"] == "lbracket":
+            pts = np.array([[-s / 2, -s], [0, -s], [0, s / 2], [s, s / 2], [s, s], [-s / 2, s]])
+        else:
+            t = np.linspace(0, 2 * np.pi, 40, endpoint=False)
+            pts = np.stack([s / 2 * np.cos(t), s / 2 * np.sin(t)], axis=1)
+        a = np.deg2rad(obj["angle"])
+        rot = np.array([[np.cos(a), -np.sin(a)], [np.sin(a), np.cos(a)]])
+        return (pts @ rot.T + (cx, cy)).astype(np.int32)
+
+    def render(self):
+        frame = np.full((self.height, self.width, 3), 225, np.uint8)
+        for obj in self.objects:
+            cv2.fillPoly(frame, [self._polygon(obj)], (40, 40, 40))
+        if self.qr_image is not None:
+            x, y, w, h = self.qr_region()
+            frame[y:y + h, x:x + w] = self.qr_image
+        return frame
+
+
+class RecordedFrames:
+    def __init__(self, frames_dir):
+        """Cycles through recorded images (e.g. FrameRecorder snapshots) in name order"""
+        paths = [os.path.join(frames_dir, f) for f in sorted(os.listdir(frames_dir))
+                 if f.lower().endswith(IMAGE_EXTENSIONS)]
+        self.frames = [frame for frame in (cv2.imread(p) for p in paths) if frame is not None]
+        if not self.frames:
+            raise ValueError(f"[RecordedFrames] No readable images found in {frames_dir}")
+        self.index = 0
+        self.refills = 0
+        self.layout = "recorded"
+        self.num_objects = None
+
+    def qr_region(self):
+        return None
+
+    def remove_object(self, coords):
+        self.index = (self.index + 1) % len(self.frames)
+
+    def render(self):
+        return self.frames[self.index]
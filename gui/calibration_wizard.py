@@ -4,9 +4,12 @@ from robodk.robomath import Mat
 from vision.vision_utils import set_camera_to_robot_transform
 
 class CalibrationWizard(QWidget):
-    def __init__(self):
+    def __init__(self, store=None, stream=None):
         super().__init__()
-        self.setWindowTitle("Calibration Wizard: Vision ↔ Robot")
+        self.store = store  # optional PositionStore the transform is persisted to
+        self.stream = stream  # optional CameraStream; without it the global transform is set
+        title = "Calibration Wizard: Vision ↔ Robot"
+        self.setWindowTitle(f"{title} ({stream.name})" if stream is not None else title)
         self.setGeometry(300, 300, 400, 300)
 
         layout = QVBoxLayout()
@@ -38,7 +41,15 @@ class CalibrationWizard(QWidget):
 
             mat_values = [rows[0], rows[1], rows[2], rows[3]]
             T = Mat(mat_values)
-            set_camera_to_robot_transform(T)
+            camera = None
+            if self.stream is not None:
+                self.stream.T_cam_to_robot = T
+                camera = self.stream.name
+            else:
+                set_camera_to_robot_transform(T)
+            if self.store is not None:
+                self.store.set_calibration(T_cam_to_robot=mat_values, camera=camera)
+                self.store.save()
             QMessageBox.information(self, "Success", "Calibration transform set successfully!")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Invalid input: {e}")
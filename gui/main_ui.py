@@ -9,19 +9,25 @@ from PyQt5.QtCore import QTimer, Qt, QRect, QPoint, QSize
 from PyQt5.QtGui import QPixmap, QImage
 import cv2
 
-from vision.camera_handler import CameraHandler
+from vision.camera_manager import CameraManager
+from vision.frame_recorder import FrameRecorder
+from vision.detection_pool import DetectionPool
 from vision.qr_detector import QRDetector
 from vision.object_detector import ObjectDetector
-from vision.vision_utils import pixel_to_mm, set_calibration_scale, vision_to_robot_coords
+from vision.part_library import PartLibrary
+from vision.vision_utils import set_calibration_scale, get_calibration_scale, set_camera_to_robot_transform
+from robodk.robomath import Mat
 from robot.robodk_handler import RoboDKHandler
 from robot.path_planner import PathPlanner
 from gui.object_panel import ObjectPanel
 from gui.calibration_wizard import CalibrationWizard
 
 
-camera = CameraHandler()
+camera_manager = CameraManager()
+recorder = FrameRecorder(clock=camera_manager.clock)
 qr_detector = QRDetector()
-object_detector = ObjectDetector()
+part_library = PartLibrary.load()
+object_detector = ObjectDetector(part_library)
 robodk = RoboDKHandler()
 planner = PathPlanner()
 
@@ -100,10 +106,16 @@ class MainUI(QWidget):
         self.origin_y_spin = QSpinBox()
         self.origin_y_spin.setRange(0, 1000)
         self.origin_y_spin.setValue(50)
+        self.detection_rate_spin = QSpinBox()
+        self.detection_rate_spin.setRange(0, 60)
+        self.detection_rate_spin.setSuffix(" Hz")
+        self.detection_rate_spin.setSpecialValueText("Every frame")
 
         # Buttons
         self.capture_button = QPushButton("📸 Capture")
+        self.record_button = QPushButton("⏺️ Record")
         self.detect_button = QPushButton("🎯 Detect")
+        self.pool_button = QPushButton("⚡ Continuous Detect")
         self.execute_button = QPushButton("🤖 Execute")
         self.simulate_button = QPushButton("🧪 Simulate")
         self.calibrate_button = QPushButton("📏 Calibration Scale")
@@ -113,6 +125,7 @@ class MainUI(QWidget):
         self.set_roi_button = QPushButton("🔲 Set ROI")
         self.playback_button = QPushButton("▶️ Playback")
         self.clear_button = QPushButton("❌ Clear Taught")
+        self.resync_button = QPushButton("🔁 Resync Targets")
         self.refresh_cameras_button = QPushButton("🔄 Refresh Cameras")
 
         # Group controls in grid
@@ -132,13 +145,15 @@ class MainUI(QWidget):
         controls_layout.addWidget(self.gain_slider, 6, 1)
         controls_layout.addWidget(QLabel("Exposure"), 7, 0)
         controls_layout.addWidget(self.exposure_slider, 7, 1)
+        controls_layout.addWidget(QLabel("Detection Rate:"), 8, 0)
+        controls_layout.addWidget(self.detection_rate_spin, 8, 1)
 
         # Buttons group
         button_group = QVBoxLayout()
         for btn in [self.calibrate_button, self.wizard_button, self.capture_button,
-                    self.detect_button, self.execute_button, self.simulate_button,
+                    self.record_button, self.detect_button, self.pool_button, self.execute_button, self.simulate_button,
                     self.teach_button, self.teach_obj_button, self.set_roi_button,
-                    self.playback_button, self.clear_button]:
+                    self.playback_button, self.clear_button, self.resync_button]:
             btn.setMinimumHeight(32)
             btn.setStyleSheet("QPushButton { font-weight: bold; }")
             button_group.addWidget(btn)
@@ -171,7 +186,9 @@ class MainUI(QWidget):
 
         # Connections
         self.capture_button.clicked.connect(self.capture_frame)
+        self.record_button.clicked.connect(self.toggle_recording)
         self.detect_button.clicked.connect(self.detect_objects)
+        self.pool_button.clicked.connect(self.toggle_detection_pool)
         self.execute_button.clicked.connect(self.execute_task)
         self.simulate_button.clicked.connect(self.simulate_task)
         self.calibrate_button.clicked.connect(self.set_calibration)
@@ -181,26 +198,67 @@ class MainUI(QWidget):
         self.set_roi_button.clicked.connect(self.set_camera_roi)
         self.playback_button.clicked.connect(self.playback_positions)
         self.clear_button.clicked.connect(self.clear_positions)
+        self.resync_button.clicked.connect(self.resync_targets)
         self.refresh_cameras_button.clicked.connect(self.refresh_camera_list)
         self.camera_combo.currentIndexChanged.connect(self.switch_camera)
-        self.brightness_slider.valueChanged.connect(lambda val: camera.set_brightness(val))
-        self.gain_slider.valueChanged.connect(lambda val: camera.set_gain(val))
-        self.exposure_slider.valueChanged.connect(lambda val: camera.set_exposure(val))
+        self.brightness_slider.valueChanged.connect(lambda val: self.apply_camera_setting('set_brightness', val))
+        self.gain_slider.valueChanged.connect(lambda val: self.apply_camera_setting('set_gain', val))
+        self.exposure_slider.valueChanged.connect(lambda val: self.apply_camera_setting('set_exposure', val))
+        self.detection_rate_spin.valueChanged.connect(self.set_detection_rate)
 
         # Live update
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
         self.timer.start(30)
 
+        self.active_camera = None
+        self.recording_camera = None
+        self.detection_pool = None
+        self.latest_pool_result = None
         self.selected_object = None
         self.last_detected_objects = []
         self.should_draw_objects = False
         self.captured_image = None
+        self.restore_calibration()
         self.refresh_camera_list()
 
+    def restore_calibration(self):
+        """Global calibration, used by every camera without its own"""
+        scale, T_rows = robodk.store.get_calibration()
+        if scale is not None:
+            set_calibration_scale(scale)
+        if T_rows is not None:
+            set_camera_to_robot_transform(Mat(T_rows))
+
+    def add_camera(self, name, index):
+        """Open a camera with the calibration and detection rate saved under its name"""
+        scale, T_rows = robodk.store.get_calibration(name)
+        stream = camera_manager.add_camera(name, index,
+                                           detection_rate=robodk.store.get_detection_rate(name),
+                                           calibration_scale=scale,
+                                           T_cam_to_robot=Mat(T_rows) if T_rows is not None else None)
+        # Raw frames reach the recorder from the capture thread, so the pre-trigger buffer
+        # keeps filling while the UI thread is blocked in a robot move
+        recorder.add_ring_stream(name)
+        stream.handler.add_frame_listener(lambda ts, frame: recorder.push_frame(frame, name, timestamp=ts))
+        return stream
+
+    def get_active_stream(self):
+        if self.active_camera is None or not camera_manager.has_camera(self.active_camera):
+            return None
+        return camera_manager.get_camera(self.active_camera)
+
+    def get_active_frame(self):
+        stream = self.get_active_stream()
+        return stream.handler.get_frame() if stream is not None else None
+
+    def apply_camera_setting(self, setter, value):
+        if self.active_camera is not None and camera_manager.has_camera(self.active_camera):
+            getattr(camera_manager.get_camera(self.active_camera).handler, setter)(value)
+
     def get_user_origin(self):
         h = 720
-        frame = camera.get_frame()
+        frame = self.get_active_frame()
         if frame is not None:
             h = frame.shape[0]
         ox = self.origin_x_spin.value()
@@ -214,7 +272,12 @@ class MainUI(QWidget):
 
     def get_available_cameras(self, max_tested=5):
         available = []
+        opened = camera_manager.opened_indices()
         for i in range(max_tested):
+            if i in opened:
+                # Already streaming; probing it again would fight the capture thread
+                available.append(i)
+                continue
             cap = cv2.VideoCapture(i)
             if cap and cap.isOpened():
                 available.append(i)
@@ -224,13 +287,25 @@ class MainUI(QWidget):
     def switch_camera(self):
         index = self.camera_combo.currentData()
         if index is not None:
-            camera.set_camera_index(index)
-            camera.set_brightness(self.brightness_slider.value())
-            camera.set_gain(self.gain_slider.value())
-            camera.set_exposure(self.exposure_slider.value())
+            # Cameras stay open once added, switching only changes which one is displayed
+            name = self.camera_combo.currentText()
+            if not camera_manager.has_camera(name):
+                try:
+                    self.add_camera(name, index)
+                except RuntimeError as e:
+                    print(e)
+                    return
+            self.active_camera = name
+            # Show this camera's rate without writing it back to the store
+            self.detection_rate_spin.blockSignals(True)
+            self.detection_rate_spin.setValue(int(camera_manager.get_camera(name).detection_rate or 0))
+            self.detection_rate_spin.blockSignals(False)
+            self.apply_camera_setting('set_brightness', self.brightness_slider.value())
+            self.apply_camera_setting('set_gain', self.gain_slider.value())
+            self.apply_camera_setting('set_exposure', self.exposure_slider.value())
 
     def update_frame(self):
-        frame = camera.get_frame()
+        frame = self.get_active_frame()
         if frame is not None:
             display = frame.copy()
             ox, oy = self.get_user_origin()
@@ -253,12 +328,65 @@ class MainUI(QWidget):
                     if obj == self.selected_object:
                         cv2.rectangle(display, (px - 10, py - 10), (px + 10, py + 10), (255, 255, 0), 2)
 
+            if self.detection_pool is not None:
+                self.feed_detection_pool(frame)
+
+            recorder.push_frame(display, "overlay")
             self.image_label.setPixmap(self.convert_cv_qt(display))
 
+    def toggle_detection_pool(self):
+        if self.detection_pool is None:
+            library_dir = part_library.library_dir if part_library is not None else None
+            self.detection_pool = DetectionPool(part_library_dir=library_dir)
+            self.pool_button.setText(f"⏹️ Stop Continuous Detect ({self.detection_pool.num_workers} workers)")
+        else:
+            self.detection_pool.shutdown()
+            self.detection_pool = None
+            self.latest_pool_result = None
+            self.pool_button.setText("⚡ Continuous Detect")
+
+    def feed_detection_pool(self, frame):
+        """Submit the live frame to the worker processes and pick up finished results"""
+        if self.active_camera in camera_manager.cameras_due_for_detection():
+            # An exception escaping this QTimer slot would abort the app, so skip the frame instead
+            stream = camera_manager.get_camera(self.active_camera)
+            try:
+                seq = self.detection_pool.submit(frame, mm_per_px=stream.get_calibration_scale())
+            except ValueError as e:
+                print(e)
+                seq = None
+            if seq is not None:
+                stream.mark_detected(camera_manager.clock())
+
+        result = self.detection_pool.get_result()
+        while result is not None:
+            self.latest_pool_result = result
+            result = self.detection_pool.get_result()
+
+        if self.latest_pool_result is not None:
+            self.last_detected_objects = self.latest_pool_result[2]
+            self.should_draw_objects = True
+
     def detect_objects(self):
-        frame = camera.get_frame()
+        if self.detection_pool is not None:
+            # Continuous mode: commit the latest result coming from the pool
+            if self.latest_pool_result is None:
+                return
+            _, pool_frame, objects, _ = self.latest_pool_result
+            frame = pool_frame.copy()
+            object_detector.draw_objects(frame, objects)
+            self.last_detected_objects = objects
+            self.object_panel.update_objects(objects)
+            self.should_draw_objects = True
+            self.captured_image = frame
+            self.captured_label.setPixmap(self.convert_cv_qt(self.captured_image))
+            return
+
+        frame = self.get_active_frame()
         if frame is not None:
-            objects, _ = object_detector.detect_objects(frame)
+            stream = camera_manager.get_camera(self.active_camera)
+            objects, _ = object_detector.detect_objects(frame, mm_per_px=stream.get_calibration_scale())
+            stream.mark_detected(camera_manager.clock())
             self.last_detected_objects = objects
             self.object_panel.update_objects(objects)
             self.should_draw_objects = True
@@ -273,9 +401,24 @@ class MainUI(QWidget):
         return QPixmap.fromImage(qt_image)
 
     def capture_frame(self):
-        frame = camera.get_frame()
+        frame = self.get_active_frame()
         if frame is not None:
-            cv2.imwrite("assets/capture.jpg", frame)
+            path = recorder.snapshot(frame)
+            if path:
+                print(f"[MainUI] 📸 Snapshot queued: {path}")
+
+    def toggle_recording(self):
+        if self.recording_camera is not None:
+            recorder.stop_recording(self.recording_camera)
+            recorder.stop_recording("overlay")
+            self.recording_camera = None
+            self.record_button.setText("⏺️ Record")
+        elif self.active_camera is not None:
+            # Raw frames of the camera come from its capture thread, the overlay from the UI
+            self.recording_camera = self.active_camera
+            recorder.start_recording(self.recording_camera)
+            recorder.start_recording("overlay")
+            self.record_button.setText("⏹️ Stop Recording")
 
     def execute_task(self):
         if not self.selected_object:
@@ -285,10 +428,13 @@ class MainUI(QWidget):
         ox, oy = self.get_user_origin()
         adj_x = px - ox
         adj_y = oy - py  # <--- Inverted Y-axis
-        coords_mm = pixel_to_mm((adj_x, adj_y))
-        pose = vision_to_robot_coords(*coords_mm)
+        stream = camera_manager.get_camera(self.active_camera)
+        coords_mm = stream.pixel_to_mm((adj_x, adj_y))
+        pose = stream.vision_to_robot_coords(*coords_mm, angle_deg=self.selected_object.get('angle', 0.0))
         path = planner.generate_path(self.operation_combo.currentText(), pose)
-        robodk.execute_path(path)
+        label = f"failed_{self.operation_combo.currentText().lower()}"
+        # Triggered at the unreachable pose, not after the (blocking) path has finished
+        robodk.execute_path(path, on_unreachable=lambda _: recorder.trigger_clip(label))
 
     def simulate_task(self):
         if not self.selected_object:
@@ -298,19 +444,38 @@ class MainUI(QWidget):
         ox, oy = self.get_user_origin()
         adj_x = px - ox
         adj_y = oy - py  # <--- Inverted Y-axis
-        coords_mm = pixel_to_mm((adj_x, adj_y))
-        pose = vision_to_robot_coords(*coords_mm)
+        stream = camera_manager.get_camera(self.active_camera)
+        coords_mm = stream.pixel_to_mm((adj_x, adj_y))
+        pose = stream.vision_to_robot_coords(*coords_mm, angle_deg=self.selected_object.get('angle', 0.0))
         path = planner.generate_path(self.operation_combo.currentText(), [pose])
         robodk.simulate_path(path)
 
     def set_calibration(self):
-        scale, ok = QInputDialog.getDouble(self, "Set Calibration Scale", "Enter mm per pixel:",
+        """Set mm/px for the active camera (or the global fallback when no camera is open)"""
+        stream = self.get_active_stream()
+        title = f"Set Calibration Scale ({stream.name})" if stream is not None else "Set Calibration Scale"
+        scale, ok = QInputDialog.getDouble(self, title, "Enter mm per pixel:",
+                                           stream.get_calibration_scale() if stream is not None else get_calibration_scale(),
                                            decimals=6, min=0.0001, max=100.0)
-        if ok:
+        if not ok:
+            return
+        if stream is not None:
+            stream.calibration_scale = scale
+            robodk.store.set_calibration(scale=scale, camera=stream.name)
+        else:
             set_calibration_scale(scale)
+            robodk.store.set_calibration(scale=scale)
+        robodk.store.save()
+
+    def set_detection_rate(self, rate):
+        stream = self.get_active_stream()
+        if stream is not None:
+            stream.detection_rate = rate or None
+            robodk.store.set_detection_rate(stream.name, rate)
+            robodk.store.save()
 
     def open_calibration_wizard(self):
-        self.wizard = CalibrationWizard()
+        self.wizard = CalibrationWizard(robodk.store, self.get_active_stream())
         self.wizard.show()
 
     def teach_position(self):
@@ -323,8 +488,11 @@ class MainUI(QWidget):
     def clear_positions(self):
         robodk.clear_taught_positions()
 
+    def resync_targets(self):
+        robodk.resync_targets()
+
     def set_camera_roi(self):
-        frame = camera.get_frame()
+        frame = self.get_active_frame()
         if frame is not None:
             img = self.convert_cv_qt(frame).toImage()
             roi_selector = ROISelector(img, self)
@@ -342,7 +510,10 @@ class MainUI(QWidget):
 
     def closeEvent(self, event):
         self.timer.stop()
-        camera.release()
+        camera_manager.release_all()
+        recorder.close()
+        if self.detection_pool is not None:
+            self.detection_pool.shutdown()
         super().closeEvent(event)
 
 
@@ -1,4 +1,4 @@
-from gui.main_ui import launch_gui
-
 if __name__ == '__main__':
+    # Imported here so detection worker processes (spawn) do not build the UI again
+    from gui.main_ui import launch_gui
     launch_gui()
\ No newline at end of file
@@ -0,0 +1,158 @@
+# robot/position_store.py
+import os
+import json
+import threading
+from datetime import datetime
+
+FORMAT_VERSION = 1
+
+
+class PositionStore:
+    def __init__(self, path="assets/taught_positions.json"):
+        """
+        On-disk store for taught joints, object poses and calibration.
+        Entries are indexed by name; every save bumps `revision` and the file is
+        replaced atomically so a crash never leaves a half-written store.
+        Poses are plain 4x4 row lists, joints plain lists (no RoboDK types).
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.revision = 0
+        self.next_index = 0
+        self.positions = {}
+        self.object_poses = {}
+        self.calibration = {}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        version = data.get("format_version", 0)
+        if version > FORMAT_VERSION:
+            raise ValueError(f"[PositionStore] {self.path} has format version {version}, "
+                             f"this build only reads up to {FORMAT_VERSION}")
+        with self.lock:
+            self.revision = data.get("revision", 0)
+            self.next_index = data.get("next_index", len(data.get("positions", {})))
+            self.positions = data.get("positions", {})
+            self.object_poses = data.get("object_poses", {})
+            self.calibration = data.get("calibration", {})
+        print(f"[PositionStore] 📂 Loaded {len(self.positions)} positions and "
+              f"{len(self.object_poses)} object poses (rev {self.revision})")
+        return self
+
+    def save(self):
+        with self.lock:
+            self.revision += 1
+            data = {
+                "format_version": FORMAT_VERSION,
+                "revision": self.revision,
+                "saved_at": datetime.now().isoformat(timespec="seconds"),
+                "next_index": self.next_index,
+                "positions": self.positions,
+                "object_poses": self.object_poses,
+                "calibration": self.calibration
+            }
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    # --- Taught joint positions -----------------------------------------------
+
+    def next_position_name(self, prefix="TaughtPos"):
+        """Reserve the next free name without asking RoboDK for its target list"""
+        with self.lock:
+            while f"{prefix}_{self.next_index}" in self.positions:
+                self.next_index += 1
+            name = f"{prefix}_{self.next_index}"
+            self.next_index += 1
+            return name
+
+    def reserve_names(self, names, prefix="TaughtPos"):
+        """Move the name counter past any `prefix_N` already used outside the store (e.g. in the station)"""
+        with self.lock:
+            for name in names:
+                head, _, index = name.rpartition("_")
+                if head == prefix and index.isdigit():
+                    self.next_index = max(self.next_index, int(index) + 1)
+
+    def add_position(self, name, joints):
+        with self.lock:
+            self.positions[name] = {"joints": [float(j) for j in joints]}
+
+    def remove_position(self, name):
+        with self.lock:
+            return self.positions.pop(name, None) is not None
+
+    def get_position(self, name):
+        with self.lock:
+            entry = self.positions.get(name)
+            return list(entry["joints"]) if entry else None
+
+    def position_names(self):
+        with self.lock:
+            return list(self.positions.keys())
+
+    def clear_positions(self):
+        with self.lock:
+            self.positions.clear()
+
+    # --- Object poses ---------------------------------------------------------
+
+    def add_object_pose(self, name, pose_rows, angle_deg=0.0):
+        with self.lock:
+            self.object_poses[name] = {
+                "pose": [[float(v) for v in row] for row in pose_rows],
+                "angle_deg": float(angle_deg)
+            }
+
+    def get_object_pose(self, name):
+        with self.lock:
+            entry = self.object_poses.get(name)
+            return [list(row) for row in entry["pose"]] if entry else None
+
+    def object_pose_names(self):
+        with self.lock:
+            return list(self.object_poses.keys())
+
+    # --- Calibration ----------------------------------------------------------
+
+    def _camera_entry(self, camera, create=False):
+        # Global values live at the top level, per-camera ones under "cameras"
+        if camera is None:
+            return self.calibration
+        cameras = self.calibration.setdefault("cameras", {}) if create else self.calibration.get("cameras", {})
+        return cameras.setdefault(camera, {}) if create else cameras.get(camera, {})
+
+    def set_calibration(self, scale=None, T_cam_to_robot=None, camera=None):
+        """Store the global calibration, or the calibration of `camera` when given"""
+        with self.lock:
+            entry = self._camera_entry(camera, create=True)
+            if scale is not None:
+                entry["scale"] = float(scale)
+            if T_cam_to_robot is not None:
+                entry["T_cam_to_robot"] = [[float(v) for v in row] for row in T_cam_to_robot]
+
+    def get_calibration(self, camera=None):
+        """Return (scale, T_cam_to_robot rows); either is None when never saved"""
+        with self.lock:
+            entry = self._camera_entry(camera)
+            return entry.get("scale"), entry.get("T_cam_to_robot")
+
+    def set_detection_rate(self, camera, rate):
+        with self.lock:
+            self._camera_entry(camera, create=True)["detection_rate"] = float(rate) if rate else None
+
+    def get_detection_rate(self, camera):
+        """Detection rate (Hz) saved for `camera`, None = every frame"""
+        with self.lock:
+            return self._camera_entry(camera).get("detection_rate")
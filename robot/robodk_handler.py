@@ -1,35 +1,119 @@
 # robot/robodk_handler.py
 
 from robodk import robolink, robomath
+from robot.position_store import PositionStore
 
 class RoboDKHandler:
-    def __init__(self):
+    def __init__(self, store_path="assets/taught_positions.json"):
         self.RDK = robolink.Robolink()
         self.robot = self.RDK.Item('JAKA Zu5', robolink.ITEM_TYPE_ROBOT)
 
         if not self.robot.Valid():
             raise Exception("❌ JAKA Zu5 robot not found in the RoboDK station. Please load or rename correctly.")
 
-        self.taught_positions = []
-        self.taught_object_poses = []
+        self.store = PositionStore(store_path).load()
+        self.taught_positions = [self.store.get_position(name) for name in self.store.position_names()]
+        self.taught_object_poses = [robomath.Mat(self.store.get_object_pose(name))
+                                    for name in self.store.object_pose_names()]
+        self.sync_targets()
 
     def _safe_target_pose(self, pose):
         """Ensure pose has a rotation applied (e.g., align Z tool axis if needed)"""
         return pose * robomath.roty(3.14)
 
+    def _target_frame(self):
+        # Safe fallback for robot frame
+        robot_frame = self.robot.Parent()
+        if not robot_frame.Valid():
+            print("⚠️ Robot frame invalid, using station root as parent.")
+            robot_frame = self.RDK.Item('', robolink.ITEM_TYPE_FRAME)
+        return robot_frame
+
+    def sync_targets(self):
+        """
+        Recreate the stored taught positions as RoboDK joint targets in one batch.
+        Only missing targets are created; existing ones are left as they are (see resync_targets).
+        """
+        # Existing targets are known from this one name list, with no per-target lookup.
+        # Also done with an empty store so new names never collide with targets in the station
+        existing = set(self.RDK.ItemList(robolink.ITEM_TYPE_TARGET, True))
+        self.store.reserve_names(existing)
+
+        names = self.store.position_names()
+        if not names:
+            return 0
+
+        robot_frame = self._target_frame()
+        created = 0
+
+        self.RDK.Render(False)
+        try:
+            for name in names:
+                if name in existing:
+                    continue
+                joints = self.store.get_position(name)
+                target = self.RDK.AddTarget(name, robot_frame, self.robot)
+                if not target.Valid():
+                    print(f"[RoboDKHandler] ❌ Failed to restore target '{name}'")
+                    continue
+                target.setAsJointTarget()
+                target.setJoints(joints)
+                created += 1
+        finally:
+            self.RDK.Render(True)
+
+        print(f"[RoboDKHandler] 🔁 Synced {len(names)} taught targets ({created} created)")
+        return created
+
+    def resync_targets(self, tolerance=1e-3):
+        """
+        Explicit resync: create missing targets, then push the stored joints to existing ones
+        that differ by more than `tolerance` (the store is the source of truth).
+        Reads every target's name and joints, so it is a user action, not part of startup.
+        """
+        created = self.sync_targets()
+        updated = 0
+
+        self.RDK.Render(False)
+        try:
+            for target in self.RDK.ItemList(robolink.ITEM_TYPE_TARGET):
+                joints = self.store.get_position(target.Name())
+                if joints is None:
+                    continue
+                current = target.Joints().list()
+                if len(current) != len(joints) or any(abs(a - b) > tolerance for a, b in zip(current, joints)):
+                    target.setAsJointTarget()
+                    target.setJoints(joints)
+                    updated += 1
+        finally:
+            self.RDK.Render(True)
+
+        print(f"[RoboDKHandler] 🔁 Resynced taught targets ({created} created, {updated} updated)")
+        return created, updated
+
     def _pose_with_rotation(self, pose, angle_deg):
         """Apply Z rotation (around tool axis) to pose"""
         rz = robomath.rotz(angle_deg * 3.14159265 / 180.0)
         return pose * rz
 
-    def execute_path(self, path):
+    def execute_path(self, path, on_unreachable=None):
+        """
+        Execute the path; returns False if any pose could not be reached.
+        `on_unreachable(pose)` is called at the first unreachable pose, while the path is
+        still running (e.g. to trigger a clip around the failure).
+        """
+        success = True
         for pose in path:
             target = self._safe_target_pose(pose)
             joints = self.robot.SolveIK(target)
             if joints is None or joints.size(1) == 0:
                 print(f"[RoboDKHandler] ❌ Cannot reach pose: {target.Pos()}")
+                if success and on_unreachable is not None:
+                    on_unreachable(pose)
+                success = False
                 continue
             self.robot.MoveL(joints)
+        return success
 
     def simulate_path(self, path):
         for pose in path:
@@ -46,22 +130,19 @@ class RoboDKHandler:
             return
 
         joints = self.robot.Joints()
-        name = f"TaughtPos_{len(self.RDK.ItemList(robolink.ITEM_TYPE_TARGET))}"
-
-        # Safe fallback for robot frame
-        robot_frame = self.robot.Parent()
-        if not robot_frame.Valid():
-            print("⚠️ Robot frame invalid, using station root as parent.")
-            robot_frame = self.RDK.Item('', robolink.ITEM_TYPE_FRAME)
+        name = self.store.next_position_name()
+        robot_frame = self._target_frame()
 
-        target = self.RDK.AddTarget(name, self.robot, robot_frame)
+        target = self.RDK.AddTarget(name, robot_frame, self.robot)
         if not target.Valid():
             print(f"❌ Failed to create target '{name}'")
             return
 
         target.setAsJointTarget()
         target.setJoints(joints)
-        self.taught_positions.append(joints)
+        self.taught_positions.append(joints.list())
+        self.store.add_position(name, joints.list())
+        self.store.save()
         print(f"[✔] Position '{name}' saved at joints: {joints}")
 
     def playback_taught_positions(self):
@@ -71,6 +152,8 @@ class RoboDKHandler:
 
     def clear_taught_positions(self):
         self.taught_positions.clear()
+        self.store.clear_positions()
+        self.store.save()
         print("[RoboDKHandler] 🧹 Cleared all taught positions.")
 
     def has_taught_positions(self):
@@ -80,6 +163,9 @@ class RoboDKHandler:
         """Teach a pose with orientation angle"""
         full_pose = self._pose_with_rotation(pose, angle_deg)
         self.taught_object_poses.append(full_pose)
+        name = f"ObjectPose_{len(self.store.object_pose_names())}"
+        self.store.add_object_pose(name, full_pose.rows, angle_deg)
+        self.store.save()
         print(f"[RoboDKHandler] 📌 Object pose taught at {pose.Pos()} with angle {angle_deg}°")
 
     def simulate_object_poses(self):
@@ -91,12 +177,9 @@ class RoboDKHandler:
 
     def create_point(self, name, pose):
         """Create a target point in RoboDK at the given pose"""
-        reference_frame = self.robot.Frame()
-        if not reference_frame.Valid():
-            print("⚠️ Robot frame invalid. Using station root.")
-            reference_frame = self.RDK.Item('', robolink.ITEM_TYPE_FRAME)
+        reference_frame = self._target_frame()
 
-        target = self.RDK.AddTarget(name, self.robot, reference_frame)
+        target = self.RDK.AddTarget(name, reference_frame, self.robot)
         if target.Valid():
             target.setPose(pose)
             print(f"[RoboDKHandler] 📍 Target '{name}' created at pose: {pose.Pos()}")
@@ -0,0 +1,60 @@
+# robot/simulated_robot.py
+import math
+
+
+class SimulatedRobot:
+    def __init__(self, max_speed=500.0, max_accel=1000.0, settle_time=0.05, gripper_time=0.3,
+                 reach=954.0, home=(0.0, 0.0, 300.0)):
+        """
+        Offline stand-in for RoboDKHandler used by the benchmark.
+        Motion time per segment follows a trapezoidal (or triangular) velocity profile in
+        mm/s and mm/s^2, plus `settle_time` per waypoint. Poses further than `reach` mm from
+        the base are unreachable and skipped, like a failed SolveIK.
+        Nothing sleeps: time is accumulated in `elapsed` (seconds).
+        """
+        self.max_speed = max_speed
+        self.max_accel = max_accel
+        self.settle_time = settle_time
+        self.gripper_time = gripper_time
+        self.reach = reach
+        self.position = tuple(home)
+        self.elapsed = 0.0
+        self.last_motion_time = 0.0
+
+    def segment_time(self, start, end):
+        d = math.dist(start, end)
+        if d == 0:
+            return 0.0
+        # Distance needed to reach full speed and brake again
+        d_ramp = self.max_speed ** 2 / self.max_accel
+        if d >= d_ramp:
+            return d / self.max_speed + self.max_speed / self.max_accel
+        return 2.0 * math.sqrt(d / self.max_accel)
+
+    def is_reachable(self, pos):
+        return math.sqrt(pos[0] ** 2 + pos[1] ** 2 + pos[2] ** 2) <= self.reach
+
+    def execute_path(self, path, grip_at=None):
+        """
+        Move through the path; `grip_at` lists waypoint indices where the gripper acts.
+        Returns False if any pose was unreachable (same contract as RoboDKHandler).
+        """
+        grip_at = set(grip_at or [])
+        success = True
+        t = 0.0
+        for i, pose in enumerate(path):
+            pos = tuple(pose.Pos())
+            if not self.is_reachable(pos):
+                print(f"[SimulatedRobot] ❌ Cannot reach pose: {list(pos)}")
+                success = False
+                continue
+            t += self.segment_time(self.position, pos) + self.settle_time
+            if i in grip_at:
+                t += self.gripper_time
+            self.position = pos
+        self.last_motion_time = t
+        self.elapsed += t
+        return success
+
+    def simulate_path(self, path):
+        return self.execute_path(path)
@@ -1,69 +1,114 @@
 import cv2
+import time
 import threading
+from collections import deque
 
 class CameraHandler:
-    def __init__(self, camera_index=0):
-        self.cap = cv2.VideoCapture(camera_index)
-        if not self.cap.isOpened():
-            raise RuntimeError(f"[CameraHandler] Failed to open camera at index {camera_index}")
-        
+    def __init__(self, camera_index=0, buffer_size=30, clock=time.monotonic):
+        """
+        Threaded capture for a single camera.
+        Every frame is stamped with `clock` right after it is grabbed and kept in a
+        small ring buffer, so frames from several cameras can be matched in time.
+        """
+        self.camera_index = camera_index
+        self.clock = clock
         self.lock = threading.Lock()
+        self.buffer = deque(maxlen=buffer_size)
         self.frame = None
-        self.running = True
+        self.timestamp = None
+        self.frame_count = 0
+        self.cap = None
+        self.thread = None
+        self.running = False
+        self.listeners = []
+        self._open()
 
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.camera_index)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"[CameraHandler] Failed to open camera at index {self.camera_index}")
+
+        self.running = True
         self.thread = threading.Thread(target=self._update_frame, daemon=True)
         self.thread.start()
 
     def _update_frame(self):
         while self.running:
-            ret, frame = self.cap.read()
+            # grab() latches the image, so the timestamp is taken before the slower decode
+            if not self.cap.grab():
+                time.sleep(0.01)
+                continue
+            timestamp = self.clock()
+            ret, frame = self.cap.retrieve()
             if ret:
                 with self.lock:
+                    self.frame_count += 1
                     self.frame = frame
+                    self.timestamp = timestamp
+                    self.buffer.append((timestamp, self.frame_count, frame))
+                # Runs on the capture thread, so taps keep receiving frames while the UI is blocked
+                for listener in list(self.listeners):
+                    try:
+                        listener(timestamp, frame)
+                    except Exception as e:
+                        print(f"[CameraHandler] ❌ Frame listener failed: {e}")
+
+    def add_frame_listener(self, callback):
+        """
+        Call `callback(timestamp, frame)` from the capture thread for every new frame.
+        It must be quick and must not modify the frame.
+        """
+        self.listeners.append(callback)
+
+    def remove_frame_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
 
     def get_frame(self):
         with self.lock:
             return self.frame.copy() if self.frame is not None else None
 
-    def set_brightness(self, value):
-        self.cap.set(cv2.CAP_PROP_BRIGHTNESS, value / 255.0)
-
-    def set_gain(self, value):
-        self.cap.set(cv2.CAP_PROP_GAIN, value / 255.0)
+    def get_timestamped_frame(self):
+        """Return (timestamp, frame) of the latest frame, or (None, None)"""
+        with self.lock:
+            if self.frame is None:
+                return None, None
+            return self.timestamp, self.frame.copy()
 
-    def set_exposure(self, value):
-        self.cap.set(cv2.CAP_PROP_EXPOSURE, float(value))
+    def latest_timestamp(self):
+        with self.lock:
+            return self.timestamp
 
-    def release(self):
-        self.running = False
-        self.thread.join()
-        self.cap.release()
-class CameraHandler:
-    def __init__(self, camera_index=0):
-        self.camera_index = camera_index
-        self.cap = cv2.VideoCapture(self.camera_index)
+    def get_frame_near(self, timestamp):
+        """Return (timestamp, frame) of the buffered frame closest to `timestamp`"""
+        with self.lock:
+            if not self.buffer:
+                return None, None
+            ts, _, frame = min(self.buffer, key=lambda item: abs(item[0] - timestamp))
+            return ts, frame.copy()
 
     def set_camera_index(self, index):
-        if self.cap is not None:
-            self.cap.release()
+        self.release()
         self.camera_index = index
-        self.cap = cv2.VideoCapture(self.camera_index)
-
-    def get_frame(self):
-        if self.cap is not None and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if ret:
-                return frame
-        return None
+        with self.lock:
+            self.buffer.clear()
+            self.frame = None
+            self.timestamp = None
+        self._open()
 
     def set_brightness(self, value):
-        if self.cap:
-            self.cap.set(cv2.CAP_PROP_BRIGHTNESS, value)
+        self.cap.set(cv2.CAP_PROP_BRIGHTNESS, value)
 
     def set_gain(self, value):
-        if self.cap:
-            self.cap.set(cv2.CAP_PROP_GAIN, value)
+        self.cap.set(cv2.CAP_PROP_GAIN, value)
 
     def set_exposure(self, value):
-        if self.cap:
-            self.cap.set(cv2.CAP_PROP_EXPOSURE, float(value))
\ No newline at end of file
+        self.cap.set(cv2.CAP_PROP_EXPOSURE, float(value))
+
+    def release(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.cap is not None:
+            self.cap.release()
@@ -0,0 +1,126 @@
+# vision/camera_manager.py
+import time
+import threading
+
+from vision.camera_handler import CameraHandler
+from vision.vision_utils import pixel_to_mm, get_calibration_scale, vision_to_robot_coords
+
+
+class CameraStream:
+    def __init__(self, name, handler, detection_rate=None, calibration_scale=None, T_cam_to_robot=None):
+        """
+        One camera of the cell (e.g. infeed, table, outfeed).
+        `detection_rate` is in Hz (None = every frame); calibration falls back to
+        the global values in vision_utils when not set for this camera.
+        """
+        self.name = name
+        self.handler = handler
+        self.detection_rate = detection_rate
+        self.calibration_scale = calibration_scale
+        self.T_cam_to_robot = T_cam_to_robot
+        self.last_detection_time = None
+
+    def should_detect(self, now):
+        if not self.detection_rate:
+            return True
+        if self.last_detection_time is None:
+            return True
+        return now - self.last_detection_time >= 1.0 / self.detection_rate
+
+    def mark_detected(self, now):
+        self.last_detection_time = now
+
+    def get_calibration_scale(self):
+        return self.calibration_scale if self.calibration_scale is not None else get_calibration_scale()
+
+    def pixel_to_mm(self, pixel_coords):
+        return pixel_to_mm(pixel_coords, self.get_calibration_scale())
+
+    def vision_to_robot_coords(self, x_mm, y_mm, z_mm=0.0, angle_deg=0.0):
+        return vision_to_robot_coords(x_mm, y_mm, z_mm, angle_deg, T=self.T_cam_to_robot)
+
+
+class CameraManager:
+    def __init__(self, buffer_size=30, clock=time.monotonic):
+        """Owns several cameras at once; all frames are stamped on the same clock."""
+        self.buffer_size = buffer_size
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.streams = {}
+
+    def add_camera(self, name, camera_index, detection_rate=None, calibration_scale=None, T_cam_to_robot=None):
+        with self.lock:
+            if name in self.streams:
+                raise ValueError(f"[CameraManager] Camera '{name}' already exists")
+        handler = CameraHandler(camera_index, buffer_size=self.buffer_size, clock=self.clock)
+        stream = CameraStream(name, handler, detection_rate, calibration_scale, T_cam_to_robot)
+        with self.lock:
+            self.streams[name] = stream
+        return stream
+
+    def remove_camera(self, name):
+        with self.lock:
+            stream = self.streams.pop(name, None)
+        if stream is not None:
+            stream.handler.release()
+
+    def has_camera(self, name):
+        with self.lock:
+            return name in self.streams
+
+    def get_camera(self, name):
+        with self.lock:
+            stream = self.streams.get(name)
+        if stream is None:
+            raise KeyError(f"[CameraManager] Unknown camera '{name}'")
+        return stream
+
+    def camera_names(self):
+        with self.lock:
+            return list(self.streams.keys())
+
+    def opened_indices(self):
+        with self.lock:
+            return [stream.handler.camera_index for stream in self.streams.values()]
+
+    def get_frame(self, name):
+        return self.get_camera(name).handler.get_frame()
+
+    def get_nearest_frames(self, names=None, reference_time=None, max_skew=None):
+        """
+        Return {name: (timestamp, frame)} with, for every camera, the buffered frame
+        closest to `reference_time` (default: oldest of the latest frames, so every
+        camera has a frame at or after it).
+        Cameras without a frame, or further than `max_skew` seconds away, map to (None, None).
+        """
+        with self.lock:
+            streams = [self.streams[n] for n in (names or self.streams.keys()) if n in self.streams]
+
+        if reference_time is None:
+            latest = [s.handler.latest_timestamp() for s in streams]
+            latest = [ts for ts in latest if ts is not None]
+            if not latest:
+                return {s.name: (None, None) for s in streams}
+            reference_time = min(latest)
+
+        frames = {}
+        for stream in streams:
+            ts, frame = stream.handler.get_frame_near(reference_time)
+            if ts is None or (max_skew is not None and abs(ts - reference_time) > max_skew):
+                frames[stream.name] = (None, None)
+            else:
+                frames[stream.name] = (ts, frame)
+        return frames
+
+    def cameras_due_for_detection(self):
+        """Names of cameras whose detection rate allows a new detection now"""
+        now = self.clock()
+        with self.lock:
+            return [name for name, stream in self.streams.items() if stream.should_detect(now)]
+
+    def release_all(self):
+        with self.lock:
+            streams = list(self.streams.values())
+            self.streams.clear()
+        for stream in streams:
+            stream.handler.release()
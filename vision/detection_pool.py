@@ -0,0 +1,251 @@
+# vision/detection_pool.py
+import os
+import time
+import queue
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from vision.vision_utils import get_calibration_scale
+
+
+def _detection_worker(task_queue, result_queue, detect_objects, detect_qr, part_library_dir):
+    """
+    Worker process: receives (seq, slot, slot_name, shape, mm_per_px) tuples and reads the pixels
+    in place from the shared-memory slot; frames are never pickled.
+    Slots are attached on first use and re-attached when the pool grows a slot.
+    """
+    from vision.object_detector import ObjectDetector
+    from vision.qr_detector import QRDetector
+    from vision.part_library import PartLibrary
+
+    pid = os.getpid()
+    slots = {}  # slot index -> attached SharedMemory
+    part_library = PartLibrary.load(part_library_dir) if part_library_dir else None
+    object_detector = ObjectDetector(part_library) if detect_objects else None
+    qr_detector = QRDetector() if detect_qr else None
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        seq, slot, slot_name, shape, mm_per_px = task
+        # Tell the pool which frame this process holds, so it can be skipped if we die
+        result_queue.put(("start", seq, pid))
+        objects, zones, error = [], [], None
+        try:
+            shm = slots.get(slot)
+            if shm is None or shm.name != slot_name:
+                if shm is not None:
+                    shm.close()
+                shm = slots[slot] = shared_memory.SharedMemory(name=slot_name)
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            if object_detector is not None:
+                objects, _ = object_detector.detect_objects(frame, draw=False, mm_per_px=mm_per_px)
+            if qr_detector is not None:
+                zones = qr_detector.detect_zones(frame, draw=False)
+        except Exception as e:
+            error = str(e)
+        result_queue.put(("done", seq, (objects, zones, error)))
+
+    for shm in slots.values():
+        shm.close()
+
+
+class DetectionPool:
+    def __init__(self, num_workers=None, num_slots=None, slot_bytes=1920 * 1080 * 3,
+                 detect_objects=True, detect_qr=True, part_library_dir=None, lost_timeout=2.0):
+        """
+        Runs ObjectDetector / QRDetector in worker processes so detection does not
+        compete with capture and the Qt loop for the GIL.
+        Frames are copied once into a shared-memory slot; only the slot index crosses
+        the process boundary. Results are delivered in submission order.
+        Slots start at `slot_bytes` and are reallocated when a larger frame arrives.
+        Workers are started with "spawn": forking a process that runs capture threads
+        and Qt can deadlock inside OpenCV or malloc.
+        If a worker dies, the frame it held is skipped and the worker is replaced.
+        `part_library_dir` lets every worker load the PartLibrary index for classification.
+        """
+        if num_workers is None:
+            # Leave cores for the capture threads and the UI
+            num_workers = max(1, (os.cpu_count() or 2) - 2)
+        if num_slots is None:
+            num_slots = num_workers * 2
+        self.num_workers = num_workers
+        self.lost_timeout = lost_timeout
+        self.worker_args = (detect_objects, detect_qr, part_library_dir)
+
+        self.slots = [shared_memory.SharedMemory(create=True, size=slot_bytes) for _ in range(num_slots)]
+        self.free_slots = queue.Queue()
+        for i in range(num_slots):
+            self.free_slots.put(i)
+
+        self.ctx = mp.get_context("spawn")
+        self.task_queue = self.ctx.Queue()
+        self.result_queue = self.ctx.Queue()
+        self.workers = [self._start_worker() for _ in range(num_workers)]
+
+        self.lock = threading.Lock()
+        self.next_seq = 0
+        self.next_delivery = 0
+        self.in_flight = {}   # seq -> (slot, frame, submit time), frame kept in this process
+        self.owners = {}      # seq -> pid of the worker processing it
+        self.reordered = {}   # seq -> finished result (or None when lost) waiting for earlier ones
+        self.ready = queue.Queue()
+        self.dropped = 0
+        self.lost = 0
+        self.last_death = None
+        self.running = True
+        self.stopping = False
+
+        self.collector = threading.Thread(target=self._collect_results, daemon=True)
+        self.collector.start()
+
+    def _start_worker(self):
+        worker = self.ctx.Process(target=_detection_worker,
+                                  args=(self.task_queue, self.result_queue) + self.worker_args,
+                                  daemon=True)
+        worker.start()
+        return worker
+
+    def submit(self, frame, block=False, timeout=None, mm_per_px=None):
+        """
+        Queue a frame for detection. Returns its sequence number, or None when every
+        slot is busy and `block` is False (the frame is dropped and counted).
+        `mm_per_px` defaults to this process's calibration; workers never use their own.
+        """
+        if mm_per_px is None:
+            mm_per_px = get_calibration_scale()
+        if frame.dtype != np.uint8:
+            raise ValueError(f"[DetectionPool] Only uint8 frames are supported, got {frame.dtype}")
+        try:
+            slot = self.free_slots.get(block=block, timeout=timeout)
+        except queue.Empty:
+            with self.lock:
+                self.dropped += 1
+            return None
+
+        shm = self.slots[slot]
+        if frame.nbytes > shm.size:
+            # Grow this slot; workers see the new name in the task and re-attach
+            shm.close()
+            shm.unlink()
+            shm = self.slots[slot] = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=shm.buf)
+        np.copyto(view, frame)
+        with self.lock:
+            seq = self.next_seq
+            self.next_seq += 1
+            self.in_flight[seq] = (slot, frame, time.monotonic())
+        self.task_queue.put((seq, slot, shm.name, frame.shape, mm_per_px))
+        return seq
+
+    def get_result(self, block=False, timeout=None):
+        """Next result in sequence order as (seq, frame, objects, zones), or None"""
+        try:
+            return self.ready.get(block=block, timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def detect(self, frame, timeout=None, mm_per_px=None):
+        """Blocking single-frame helper, same return shape as the in-process detectors"""
+        seq = self.submit(frame, block=True, timeout=timeout, mm_per_px=mm_per_px)
+        if seq is None:
+            return [], []
+        while True:
+            result = self.get_result(block=True, timeout=timeout)
+            if result is None or result[0] > seq:
+                return [], []
+            if result[0] == seq:
+                return result[2], result[3]
+
+    def pending(self):
+        with self.lock:
+            return len(self.in_flight)
+
+    def _finish(self, seq, result):
+        """Release the slot of `seq` once and deliver everything that is now in order"""
+        entry = self.in_flight.pop(seq, None)
+        self.owners.pop(seq, None)
+        if entry is None:
+            return  # already skipped as lost
+        self.free_slots.put(entry[0])
+        self.reordered[seq] = None if result is None else (seq, entry[1]) + result
+        while self.next_delivery in self.reordered:
+            item = self.reordered.pop(self.next_delivery)
+            if item is not None:
+                self.ready.put(item)
+            self.next_delivery += 1
+
+    def _check_workers(self):
+        dead = [w for w in self.workers if not w.is_alive()]
+        if not dead:
+            return
+        now = time.monotonic()
+        dead_pids = {w.pid for w in dead}
+        with self.lock:
+            self.last_death = now
+            for seq in [s for s, pid in self.owners.items() if pid in dead_pids]:
+                print(f"[DetectionPool] ❌ Worker died while processing frame {seq}, skipping it")
+                self.lost += 1
+                self._finish(seq, None)
+        for worker in dead:
+            print(f"[DetectionPool] ⚠️ Worker {worker.pid} exited ({worker.exitcode}), starting a new one")
+            self.workers.remove(worker)
+            self.workers.append(self._start_worker())
+
+    def _skip_unclaimed(self):
+        # A worker can die between taking a task and announcing it; such frames never get an
+        # owner. After a death, frames submitted before it and still unclaimed are given up.
+        if self.last_death is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            for seq, (_, _, submitted) in list(self.in_flight.items()):
+                if (seq not in self.owners and submitted < self.last_death
+                        and now - self.last_death > self.lost_timeout):
+                    print(f"[DetectionPool] ❌ Frame {seq} was lost with a dead worker, skipping it")
+                    self.lost += 1
+                    self._finish(seq, None)
+
+    def _collect_results(self):
+        last_check = time.monotonic()
+        while self.running:
+            # Checked on a timer, not only when idle: the other workers keep results flowing
+            if not self.stopping and time.monotonic() - last_check > 0.5:
+                self._check_workers()
+                self._skip_unclaimed()
+                last_check = time.monotonic()
+            try:
+                kind, seq, payload = self.result_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            with self.lock:
+                if kind == "start":
+                    if seq in self.in_flight:
+                        self.owners[seq] = payload
+                    continue
+                objects, zones, error = payload
+                if error:
+                    print(f"[DetectionPool] ❌ Detection failed on frame {seq}: {error}")
+                self._finish(seq, (objects, zones))
+
+    def shutdown(self):
+        # Keep collecting while workers exit so their result pipes drain
+        self.stopping = True
+        for _ in self.workers:
+            self.task_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.running = False
+        self.collector.join()
+        for shm in self.slots:
+            shm.close()
+            shm.unlink()
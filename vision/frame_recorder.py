@@ -0,0 +1,271 @@
+# vision/frame_recorder.py
+import os
+import cv2
+import time
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+
+
+class FrameRecorder:
+    def __init__(self, output_dir="assets/recordings", queue_size=64, num_workers=2, fps=30.0,
+                 pre_trigger_seconds=3.0, post_trigger_seconds=2.0, ring_streams=(),
+                 clock=time.monotonic):
+        """
+        Background snapshot / video recorder.
+        Frames are handed over with non-blocking puts on bounded queues; encoder threads
+        do the disk work. When a queue is full the frame is dropped and counted, so a slow
+        disk never stalls capture or the UI.
+        Clips go through their own unbounded queue and thread and are never dropped.
+        Frames passed in must not be modified afterwards (they are not copied).
+        Timestamps given to push_frame must come from `clock`.
+        """
+        self.output_dir = output_dir
+        self.fps = fps
+        self.pre_trigger_seconds = pre_trigger_seconds
+        self.post_trigger_seconds = post_trigger_seconds
+        self.clock = clock
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+        self.clips_written = 0
+        self.clips_failed = 0
+        self.recording = set()
+        self.generations = {}
+        self.writers = {}
+        self.pending_clips = []
+
+        self.rings = {}
+        for stream in ring_streams:
+            self.add_ring_stream(stream)
+
+        # One queue per worker: a video stream is pinned to a worker so its frames stay in order
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(max(1, num_workers))]
+        self._next_queue = 0
+        self.stream_workers = {}  # stream -> queue index, assigned round-robin
+        self.workers = []
+        for q in self.queues:
+            worker = threading.Thread(target=self._worker, args=(q,), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        # Clips (seconds of frames around an event) must survive a full frame queue
+        self.clip_queue = queue.Queue()
+        self.clip_worker = threading.Thread(target=self._worker, args=(self.clip_queue,), daemon=True)
+        self.clip_worker.start()
+
+    def _timestamp(self):
+        return datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+
+    def _stream_queue(self, stream):
+        with self.lock:
+            index = self.stream_workers.get(stream)
+            if index is None:
+                index = len(self.stream_workers) % len(self.queues)
+                self.stream_workers[stream] = index
+        return self.queues[index]
+
+    def _any_queue(self):
+        with self.lock:
+            q = self.queues[self._next_queue]
+            self._next_queue = (self._next_queue + 1) % len(self.queues)
+        return q
+
+    def _file_stem(self, stream):
+        return stream.replace(" ", "_")
+
+    def _submit_clip(self, clip):
+        self.clip_queue.put(("clip", clip["path"], clip["frames"]))
+        print(f"[FrameRecorder] 🎞️ Clip {clip['path']} queued: {clip['pre_frames']} pre-trigger and "
+              f"{len(clip['frames']) - clip['pre_frames']} post-trigger frame(s)")
+
+    def _submit(self, q, job):
+        try:
+            q.put_nowait(job)
+            return True
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 100 == 0:
+                print(f"[FrameRecorder] ⚠️ Disk is falling behind, dropped {dropped} frame(s) so far")
+            return False
+
+    # --- Public API -----------------------------------------------------------
+
+    def snapshot(self, frame, prefix="capture"):
+        """Queue a timestamped JPEG snapshot; returns the target path or None if dropped"""
+        path = os.path.join(self.output_dir, f"{prefix}_{self._timestamp()}.jpg")
+        if self._submit(self._any_queue(), ("image", path, frame)):
+            return path
+        return None
+
+    def add_ring_stream(self, stream):
+        """Keep the last `pre_trigger_seconds` of `stream` for trigger_clip"""
+        with self.lock:
+            if stream not in self.rings:
+                self.rings[stream] = deque(maxlen=max(1, int(self.fps * self.pre_trigger_seconds)))
+
+    def start_recording(self, stream="raw"):
+        with self.lock:
+            self.recording.add(stream)
+            # A new generation makes the encoder start a fresh file for this stream
+            self.generations[stream] = self.generations.get(stream, 0) + 1
+        # Pin the stream to its encoder thread now, so "raw" and "overlay" land on different workers
+        self._stream_queue(stream)
+        print(f"[FrameRecorder] ⏺️ Recording stream '{stream}'")
+
+    def stop_recording(self, stream="raw"):
+        with self.lock:
+            self.recording.discard(stream)
+        self._submit_close(stream)
+        print(f"[FrameRecorder] ⏹️ Stopped recording stream '{stream}'")
+
+    def is_recording(self, stream="raw"):
+        with self.lock:
+            return stream in self.recording
+
+    def push_frame(self, frame, stream="raw", timestamp=None):
+        """
+        Feed a live frame. It goes into the pre-trigger ring buffer (if the stream has one)
+        and, when the stream is being recorded, to the video encoder.
+        Ring-buffered streams should be fed from the capture side (see
+        CameraHandler.add_frame_listener) with the capture `timestamp`, so the buffer keeps
+        filling while the UI thread is blocked.
+        """
+        now = self.clock() if timestamp is None else timestamp
+        ready = []
+        with self.lock:
+            ring = self.rings.get(stream)
+            if ring is not None:
+                ring.append((now, frame))
+                # Trim anything older than the pre-trigger window (fps may be lower than configured)
+                while ring and now - ring[0][0] > self.pre_trigger_seconds:
+                    ring.popleft()
+            for clip in self.pending_clips:
+                if clip["stream"] == stream:
+                    clip["frames"].append(frame)
+                    if now >= clip["end_time"]:
+                        ready.append(clip)
+            for clip in ready:
+                self.pending_clips.remove(clip)
+            recording = stream in self.recording
+            generation = self.generations.get(stream, 0)
+
+        for clip in ready:
+            self._submit_clip(clip)
+        if recording:
+            self._submit(self._stream_queue(stream), ("video", stream, (generation, frame)))
+
+    def trigger_clip(self, label="event"):
+        """
+        Save the last `pre_trigger_seconds` and the next `post_trigger_seconds` of every
+        ring-buffered stream to a clip (e.g. around a failed pick).
+        """
+        now = self.clock()
+        stamp = self._timestamp()
+        paths = []
+        with self.lock:
+            for stream, ring in self.rings.items():
+                frames = [frame for ts, frame in ring if now - ts <= self.pre_trigger_seconds]
+                path = os.path.join(self.output_dir, f"{label}_{stamp}_{self._file_stem(stream)}.mp4")
+                self.pending_clips.append({
+                    "stream": stream,
+                    "path": path,
+                    "frames": frames,
+                    "pre_frames": len(frames),
+                    "end_time": now + self.post_trigger_seconds
+                })
+                paths.append(path)
+        print(f"[FrameRecorder] 🎞️ Clip '{label}' triggered")
+        return paths
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "clips_written": self.clips_written,
+                "clips_failed": self.clips_failed,
+                "queued": sum(q.qsize() for q in self.queues) + self.clip_queue.qsize(),
+                "recording": sorted(self.recording)
+            }
+
+    def close(self):
+        with self.lock:
+            streams = list(self.recording)
+            self.recording.clear()
+            clips = self.pending_clips
+            self.pending_clips = []
+        for clip in clips:
+            self._submit_clip(clip)
+        for stream in streams:
+            self._submit_close(stream)
+        for q in self.queues + [self.clip_queue]:
+            q.put(None)  # blocking on purpose, the sentinel must not be dropped
+        for worker in self.workers + [self.clip_worker]:
+            worker.join()
+
+    # --- Encoder threads ------------------------------------------------------
+
+    def _submit_close(self, stream):
+        # Blocking: a dropped close would leave the file open. It goes on the stream's own
+        # queue so it stays behind the frames already queued for that file
+        self._stream_queue(stream).put(("close", stream, None))
+
+    def _open_writer(self, path, frame):
+        h, w = frame.shape[:2]
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        return cv2.VideoWriter(path, fourcc, self.fps, (w, h))
+
+    def _worker(self, q):
+        while True:
+            job = q.get()
+            if job is None:
+                break
+            kind, target, payload = job
+            try:
+                if kind == "image":
+                    cv2.imwrite(target, payload)
+                    self._count_written(1)
+                elif kind == "video":
+                    generation, frame = payload
+                    current = self.writers.get(target)
+                    if current is None or current[0] != generation:
+                        if current is not None:
+                            current[1].release()
+                        path = os.path.join(self.output_dir, f"{self._file_stem(target)}_{self._timestamp()}.mp4")
+                        current = (generation, self._open_writer(path, frame))
+                        self.writers[target] = current
+                    current[1].write(frame)
+                    self._count_written(1)
+                elif kind == "close":
+                    current = self.writers.pop(target, None)
+                    if current is not None:
+                        current[1].release()
+                elif kind == "clip":
+                    if not payload:
+                        raise ValueError("no frames were captured for this clip")
+                    writer = self._open_writer(target, payload[0])
+                    for frame in payload:
+                        writer.write(frame)
+                    writer.release()
+                    self._count_written(len(payload))
+                    with self.lock:
+                        self.clips_written += 1
+                    print(f"[FrameRecorder] 💾 Clip saved to {target}")
+            except Exception as e:
+                if kind == "clip":
+                    with self.lock:
+                        self.clips_failed += 1
+                print(f"[FrameRecorder] ❌ Failed to write {target}: {e}")
+
+        # Streams are pinned to one worker, so each worker releases its own writers
+        for stream in [s for s in list(self.writers) if self._stream_queue(s) is q]:
+            self.writers.pop(stream)[1].release()
+
+    def _count_written(self, n):
+        with self.lock:
+            self.written += n
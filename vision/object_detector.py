@@ -2,16 +2,22 @@ import cv2
 import numpy as np
 
 class ObjectDetector:
-    def __init__(self):
-        pass
+    def __init__(self, part_library=None):
+        """`part_library` (PartLibrary) is optional; when set, objects get a part type and angle"""
+        self.part_library = part_library
 
-    def detect_objects(self, frame):
+    def find_contours(self, frame):
         # Preprocess
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         blurred = cv2.GaussianBlur(gray, (7, 7), 0)
         _, thresh = cv2.threshold(blurred, 127, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
 
         contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return contours
+
+    def detect_objects(self, frame, draw=True, mm_per_px=None):
+        """`mm_per_px` is the calibration of the camera the frame came from (part size feature)"""
+        contours = self.find_contours(frame)
 
         objects = []
         for idx, cnt in enumerate(contours):
@@ -20,15 +26,33 @@ class ObjectDetector:
                 x, y, w, h = cv2.boundingRect(cnt)
                 center = (x + w // 2, y + h // 2)
                 label = f"Object{idx+1}"
+                part, angle = None, 0.0
 
-                # Draw detection on the frame
-                cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
-                cv2.putText(frame, label, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+                if self.part_library is not None:
+                    part, angle, _ = self.part_library.classify(cnt, mm_per_px)
+                    if part is not None:
+                        label = f"{part}_{idx+1}"
 
                 # Save for UI
                 objects.append({
                     "label": label,
-                    "coords": center
+                    "coords": center,
+                    "bbox": (x, y, w, h),
+                    "part": part,
+                    "angle": angle
                 })
 
+        if draw:
+            self.draw_objects(frame, objects)
+
         return objects, []
+
+    def draw_objects(self, frame, objects):
+        """Draw detections on the frame (also used for results coming from the detection pool)"""
+        for obj in objects:
+            x, y, w, h = obj["bbox"]
+            text = obj["label"]
+            if obj.get("part") is not None:
+                text = f"{text} {obj['angle']:.0f}deg"
+            cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+            cv2.putText(frame, text, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
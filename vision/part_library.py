@@ -0,0 +1,303 @@
+# vision/part_library.py
+"""
+Indexed part recognition.
+
+Build the index from reference images (one sub-directory per SKU):
+
+    python -m vision.part_library build assets/part_images --scale 0.5
+"""
+import os
+import sys
+import argparse
+import cv2
+import numpy as np
+
+from vision.object_detector import ObjectDetector
+from vision.vision_utils import get_calibration_scale
+from robot.position_store import PositionStore
+
+LIBRARY_VERSION = 2
+SIGNATURE_BINS = 128
+MAX_CANDIDATES = 4       # nearest references checked for chirality before giving up
+CHIRALITY_MARGIN = 0.1   # signature RMS by which the mirrored reference must fit better to reject
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def _resample_contour(contour, n_points):
+    """Evenly resample a (possibly CHAIN_APPROX_SIMPLE) contour along its perimeter"""
+    pts = contour.reshape(-1, 2).astype(np.float64)
+    closed = np.vstack([pts, pts[:1]])
+    seg = np.sqrt((np.diff(closed, axis=0) ** 2).sum(axis=1))
+    dist = np.concatenate([[0.0], np.cumsum(seg)])
+    if dist[-1] == 0:
+        return pts
+    samples = np.linspace(0, dist[-1], n_points, endpoint=False)
+    x = np.interp(samples, dist, closed[:, 0])
+    y = np.interp(samples, dist, closed[:, 1])
+    return np.stack([x, y], axis=1)
+
+
+def radial_signature(contour, bins=SIGNATURE_BINS):
+    """
+    Part area in each angular sector around the centroid, as an equivalent radius
+    normalised by its mean.
+    Angles are measured with Y up (counter-clockwise on screen), like the UI coordinates.
+    Rotating the part shifts this signature circularly.
+    Sector areas are summed from signed boundary triangles, so concave parts (and parts whose
+    centroid lies on or outside their own edge, like an L) give a stable signature.
+    """
+    m = cv2.moments(contour)
+    if m["m00"] == 0:
+        return np.zeros(bins)
+    cx, cy = m["m10"] / m["m00"], m["m01"] / m["m00"]
+    pts = _resample_contour(contour, bins * 8)
+    x, y = pts[:, 0] - cx, -(pts[:, 1] - cy)
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    area = 0.5 * (x * y_next - x_next * y)
+    theta = np.arctan2(y + y_next, x + x_next) % (2 * np.pi)
+    idx = (theta / (2 * np.pi) * bins).astype(int) % bins
+
+    sectors = np.zeros(bins)
+    np.add.at(sectors, idx, area)
+    # Contour orientation depends on the finder; make the total area positive
+    if sectors.sum() < 0:
+        sectors = -sectors
+    signature = np.sqrt(np.clip(sectors, 0, None))
+    if signature.mean() == 0:
+        return signature
+    return signature / signature.mean()
+
+
+def shape_descriptor(contour, mm_per_px):
+    """
+    Rotation invariant feature vector used for the index lookup, plus the radial signature.
+    The signature is only used for the rotation step; its spectrum is not in the KD-tree
+    vector because for concave parts it still shifts with how the contour rasterises.
+    """
+    area = cv2.contourArea(contour)
+    perimeter = cv2.arcLength(contour, True)
+    hull_area = cv2.contourArea(cv2.convexHull(contour))
+    (_, _), (rw, rh), _ = cv2.minAreaRect(contour)
+
+    hu = cv2.HuMoments(cv2.moments(contour)).flatten()
+    # Log magnitudes with a floor: the higher moments of near-symmetric parts are ~0 and
+    # their sign/log would otherwise be pure noise (the 7th also flips sign when mirrored)
+    hu = -np.log10(np.abs(hu) + 1e-10)
+
+    extras = [
+        area / hull_area if hull_area > 0 else 0.0,                        # solidity
+        max(rw, rh) / min(rw, rh) if min(rw, rh) > 0 else 0.0,             # elongation
+        4 * np.pi * area / perimeter ** 2 if perimeter > 0 else 0.0,       # circularity
+        np.log10(area * mm_per_px ** 2 + 1e-9)                             # physical size
+    ]
+    return np.concatenate([hu, extras]).astype(np.float32), radial_signature(contour)
+
+
+def estimate_rotation(signature, reference_signature):
+    """Rotation (deg, CCW) of `signature` relative to the reference, via circular cross-correlation"""
+    bins = len(signature)
+    corr = np.fft.irfft(np.fft.rfft(signature) * np.conj(np.fft.rfft(reference_signature)), n=bins)
+    k = int(np.argmax(corr))
+    # Parabolic refinement between neighbouring bins
+    left, centre, right = corr[(k - 1) % bins], corr[k], corr[(k + 1) % bins]
+    denom = left - 2 * centre + right
+    offset = 0.5 * (left - right) / denom if denom != 0 else 0.0
+    angle = (k + offset) * 360.0 / bins
+    return ((angle + 180.0) % 360.0) - 180.0
+
+
+def signature_residual(signature, reference_signature):
+    """RMS difference of two signatures at their best circular alignment"""
+    corr = np.fft.irfft(np.fft.rfft(signature) * np.conj(np.fft.rfft(reference_signature)), n=len(signature))
+    sq = signature @ signature + reference_signature @ reference_signature - 2 * corr.max()
+    return float(np.sqrt(max(sq, 0.0) / len(signature)))
+
+
+def mirror_signature(signature):
+    """Signature of the mirror image (angle -> -angle)"""
+    return np.roll(signature[::-1], 1)
+
+
+def is_mirrored(signature, reference_signature, margin=CHIRALITY_MARGIN):
+    """
+    True when the contour fits the mirrored reference clearly better than the reference.
+    Hu moments ignore mirroring, so a flipped part (or its left/right variant) would
+    otherwise match with a meaningless angle. Mirror-symmetric parts fit both equally.
+    """
+    direct = signature_residual(signature, reference_signature)
+    mirrored = signature_residual(signature, mirror_signature(reference_signature))
+    return direct - mirrored > margin
+
+
+class PartLibrary:
+    def __init__(self, library_dir="assets/part_library", max_distance=4.0):
+        """
+        Reference descriptors for every SKU, kept in a FLANN KD-tree so a contour is
+        classified with a nearest-neighbour lookup instead of a scan over all templates.
+        `max_distance` is the largest accepted (normalised, squared) descriptor distance.
+        """
+        self.library_dir = library_dir
+        self.max_distance = max_distance
+        self.detector = ObjectDetector()
+
+        self.skus = []
+        self.features = []
+        self.signatures = []
+        self.mean = None
+        self.std = None
+        self.index = None
+        self._normalised = None
+
+    # --- Building -------------------------------------------------------------
+
+    def add_reference_contour(self, sku, contour, mm_per_px=None):
+        if mm_per_px is None:
+            mm_per_px = get_calibration_scale()
+        feature, signature = shape_descriptor(contour, mm_per_px)
+        self.skus.append(sku)
+        self.features.append(feature)
+        self.signatures.append(signature)
+        self.index = None
+
+    def add_reference_image(self, sku, image, mm_per_px=None):
+        """Use the largest contour of a reference image (part on a contrasting background)"""
+        contours = self.detector.find_contours(image)
+        if not contours:
+            raise ValueError(f"[PartLibrary] No contour found in reference image for '{sku}'")
+        self.add_reference_contour(sku, max(contours, key=cv2.contourArea), mm_per_px)
+
+    def add_reference_directory(self, image_dir, mm_per_px=None):
+        """One sub-directory per SKU, each holding one or more reference images"""
+        for sku in sorted(os.listdir(image_dir)):
+            sku_dir = os.path.join(image_dir, sku)
+            if not os.path.isdir(sku_dir):
+                continue
+            for filename in sorted(os.listdir(sku_dir)):
+                if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                image = cv2.imread(os.path.join(sku_dir, filename))
+                if image is None:
+                    print(f"[PartLibrary] ⚠️ Cannot read {filename} for '{sku}'")
+                    continue
+                self.add_reference_image(sku, image, mm_per_px)
+
+    def build(self):
+        if not self.features:
+            raise ValueError("[PartLibrary] No reference parts to index")
+        features = np.vstack(self.features).astype(np.float32)
+        self.mean = features.mean(axis=0)
+        self.std = np.maximum(features.std(axis=0), 0.05)
+        self._normalised = ((features - self.mean) / self.std).astype(np.float32)
+        self.index = cv2.flann_Index(self._normalised, dict(algorithm=1, trees=4))  # KD-tree
+        print(f"[PartLibrary] 📚 Indexed {len(self.skus)} references of {len(set(self.skus))} part types")
+
+    # --- Persistence ----------------------------------------------------------
+
+    def _paths(self):
+        return (os.path.join(self.library_dir, "parts.npz"),
+                os.path.join(self.library_dir, "parts.flann"))
+
+    def save(self):
+        if self.index is None:
+            self.build()
+        os.makedirs(self.library_dir, exist_ok=True)
+        data_path, index_path = self._paths()
+        np.savez(data_path,
+                 version=np.array(LIBRARY_VERSION),
+                 skus=np.array(self.skus),
+                 features=np.vstack(self.features),
+                 signatures=np.vstack(self.signatures),
+                 mean=self.mean,
+                 std=self.std)
+        self.index.save(index_path)
+
+    @classmethod
+    def load(cls, library_dir="assets/part_library", **kwargs):
+        """Load a saved library, or return None when there is none on disk"""
+        library = cls(library_dir, **kwargs)
+        data_path, index_path = library._paths()
+        if not os.path.exists(data_path):
+            return None
+        data = np.load(data_path)
+        if int(data["version"]) != LIBRARY_VERSION:
+            print(f"[PartLibrary] ⚠️ Library version {int(data['version'])} is not supported, rebuild it")
+            return None
+        library.skus = [str(s) for s in data["skus"]]
+        library.features = list(data["features"])
+        library.signatures = list(data["signatures"])
+        library.mean = data["mean"]
+        library.std = data["std"]
+        library._normalised = ((data["features"] - library.mean) / library.std).astype(np.float32)
+        if os.path.exists(index_path):
+            library.index = cv2.flann_Index()
+            library.index.load(library._normalised, index_path)
+        else:
+            library.build()
+        return library
+
+    # --- Lookup ---------------------------------------------------------------
+
+    def classify(self, contour, mm_per_px=None):
+        """Return (sku, angle_deg, distance); sku is None when nothing is close enough"""
+        if self.index is None:
+            if not self.features:
+                return None, 0.0, float("inf")
+            self.build()
+        if mm_per_px is None:
+            mm_per_px = get_calibration_scale()
+
+        feature, signature = shape_descriptor(contour, mm_per_px)
+        query = ((feature - self.mean) / self.std).astype(np.float32).reshape(1, -1)
+        k = min(MAX_CANDIDATES, len(self.skus))
+        indices, dists = self.index.knnSearch(query, k, params={})
+        # Left/right variants share a descriptor, so look past a neighbour that is the mirror image
+        for best, distance in zip(indices[0], dists[0]):
+            best, distance = int(best), float(distance)
+            if distance > self.max_distance:
+                break
+            if is_mirrored(signature, self.signatures[best]):
+                continue
+            return self.skus[best], estimate_rotation(signature, self.signatures[best]), distance
+        return None, 0.0, float(dists[0][0])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the part recognition index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="index reference images, one sub-directory per SKU")
+    build.add_argument("image_dir")
+    build.add_argument("--scale", type=float, default=None,
+                       help="mm per pixel of the reference images (default: the scale saved in --store)")
+    build.add_argument("--camera", default=None,
+                       help="use the scale saved for this camera (e.g. 'Camera 0') instead of the global one")
+    build.add_argument("--store", default="assets/taught_positions.json",
+                       help="position store holding the saved calibration")
+    build.add_argument("--library-dir", default="assets/part_library")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.isdir(args.image_dir):
+        print(f"[PartLibrary] ❌ {args.image_dir} is not a directory")
+        return 1
+    scale = args.scale
+    if scale is None:
+        # A fresh process only knows the module default of 1.0, which would skew the size feature
+        scale, _ = PositionStore(args.store).load().get_calibration(args.camera)
+        if scale is None:
+            print(f"[PartLibrary] ❌ No calibration scale saved in {args.store}, pass --scale")
+            return 1
+        print(f"[PartLibrary] 📏 Using saved scale {scale} mm/px")
+    library = PartLibrary(args.library_dir)
+    library.add_reference_directory(args.image_dir, scale)
+    if not library.skus:
+        print(f"[PartLibrary] ❌ No reference images found in {args.image_dir}")
+        return 1
+    library.save()
+    print(f"[PartLibrary] 💾 Library written to {args.library_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
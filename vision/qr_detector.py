@@ -4,7 +4,7 @@ class QRDetector:
     def __init__(self):
         self.detector = cv2.QRCodeDetector()
 
-    def detect_zones(self, frame):
+    def detect_zones(self, frame, draw=True):
         zones = []
         retval, decoded_info, points, _ = self.detector.detectAndDecodeMulti(frame)
         if retval and points is not None:
@@ -15,6 +15,8 @@ class QRDetector:
                         "label": text,
                         "coords": tuple(pts[0])
                     })
+                    if not draw:
+                        continue
                     for j in range(4):
                         pt1 = tuple(pts[j])
                         pt2 = tuple(pts[(j + 1) % 4])